@@ -0,0 +1,160 @@
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ytdlp_wrapper import PROGRESS_RE, BatchDashboard, BatchJob, format_size, parse_size
+
+MIB = 1024 ** 2
+
+
+class FakeDashboard:
+    def __init__(self):
+        self.refreshes = 0
+
+    def refresh(self, force=False):
+        self.refreshes += 1
+
+
+@pytest.fixture
+def job(tmp_path):
+    job = BatchJob(FakeDashboard(), 1, "https://example.com/v", str(tmp_path / "00001.log"))
+    yield job
+    if not job.log.closed:
+        job.close()
+
+
+def feed(job, lines):
+    for line in lines:
+        job.handle_line(line)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("10.00MiB", 10 * MIB),
+    ("512KiB", 512 * 1024),
+    ("1.5GiB", 1.5 * 1024 ** 3),
+    ("250KB", 250000),
+    ("900B", 900),
+    ("NA", 0),
+])
+def test_parse_size(text, expected):
+    assert parse_size(text) == expected
+
+
+@pytest.mark.parametrize("num_bytes, expected", [
+    (0, "0.0B"),
+    (1536, "1.5KiB"),
+    (10 * MIB, "10.0MiB"),
+    (3 * 1024 ** 4, "3.0TiB"),
+])
+def test_format_size(num_bytes, expected):
+    assert format_size(num_bytes) == expected
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("[download]  45.3% of   10.00MiB at    2.50MiB/s ETA 00:03",
+     {"percent": "45.3", "total": "10.00MiB", "speed": "2.50MiB/s", "eta": "00:03"}),
+    ("[download]  12.0% of ~  98.27MiB at    1.20MiB/s ETA 01:12 (frag 3/25)",
+     {"percent": "12.0", "total": "98.27MiB", "speed": "1.20MiB/s", "eta": "01:12"}),
+    ("[download]   0.0% of   10.00MiB at  Unknown B/s ETA Unknown",
+     {"percent": "0.0", "total": "10.00MiB", "speed": None, "eta": None}),
+    ("[download] 100% of   10.00MiB in 00:00:03 at 3.21MiB/s",
+     {"percent": "100", "total": "10.00MiB", "speed": "3.21MiB/s", "eta": None}),
+])
+def test_progress_regex(line, expected):
+    assert PROGRESS_RE.search(line).groupdict() == expected
+
+
+def test_progress_updates_job(job):
+    feed(job, [
+        "[download] Destination: /tmp/video.mp4",
+        "[download]  50.0% of ~  10.00MiB at    2.50MiB/s ETA 00:02",
+    ])
+    assert job.percent == 50.0
+    assert job.speed == "2.50MiB/s"
+    assert job.eta == "00:02"
+    assert job.downloaded_bytes == 5 * MIB
+
+
+def test_unknown_speed_and_eta(job):
+    feed(job, [
+        "[download] Destination: /tmp/video.mp4",
+        "[download]  50.0% of   10.00MiB at    2.50MiB/s ETA 00:02",
+        "[download]  60.0% of   10.00MiB at  Unknown B/s ETA Unknown",
+    ])
+    assert job.speed is None
+    assert job.eta is None
+    assert job.downloaded_bytes == 6 * MIB
+
+
+def test_completed_files_in_a_row_are_summed(job):
+    for name in ("a", "b", "c"):
+        feed(job, [
+            f"[download] Destination: /tmp/{name}.mp4",
+            "[download] 100% of   10.00MiB in 00:00:03 at 3.21MiB/s",
+        ])
+    job.close()
+    assert job.downloaded_bytes == 30 * MIB
+
+
+def test_playlist_with_video_and_audio_tracks(job):
+    feed(job, [
+        "[download] Downloading item 1 of 2",
+        "[download] Destination: /tmp/one.f137.mp4",
+        "[download]  40.0% of   20.00MiB at    4.00MiB/s ETA 00:03",
+        "[download] 100% of   20.00MiB in 00:00:05 at 4.00MiB/s",
+        "[download] Destination: /tmp/one.f140.m4a",
+        "[download] 100% of    2.00MiB in 00:00:01 at 2.00MiB/s",
+        "[Merger] Merging formats into \"/tmp/one.mp4\"",
+        "[download] Downloading item 2 of 2",
+        "[download] Destination: /tmp/two.mp4",
+        "[download]  25.0% of    8.00MiB at    1.00MiB/s ETA 00:06",
+    ])
+    assert job.downloaded_bytes == 24 * MIB
+    job.close()
+    assert job.downloaded_bytes == 24 * MIB
+
+
+def test_already_downloaded_files_are_not_counted(job):
+    feed(job, [
+        "[download] /tmp/a.mp4 has already been downloaded",
+        "[download] 100% of   10.00MiB",
+        "[download] Destination: /tmp/b.mp4",
+        "[download] 100% of    4.00MiB in 00:00:01 at 4.00MiB/s",
+    ])
+    job.close()
+    assert job.downloaded_bytes == 4 * MIB
+
+
+def test_error_and_log_file(job):
+    feed(job, ["ERROR: [generic] Unsupported URL: https://example.com/v"])
+    job.close()
+    assert job.error == "ERROR: [generic] Unsupported URL: https://example.com/v"
+    with open(job.log_file, encoding="utf-8") as f:
+        assert f.read() == "ERROR: [generic] Unsupported URL: https://example.com/v\n"
+
+
+def test_dashboard_summary_without_tty(tmp_path):
+    stream = io.StringIO()
+    dashboard = BatchDashboard(2, str(tmp_path / "lote"), summary_interval=60, stream=stream)
+    try:
+        first = dashboard.start_job(1, "https://example.com/1")
+        feed(first, [
+            "[download] Destination: /tmp/1.mp4",
+            "[download] 100% of   10.00MiB in 00:00:03 at 3.21MiB/s",
+        ])
+        dashboard.finish_job(first, success=True)
+        second = dashboard.start_job(2, "https://example.com/2")
+        dashboard.finish_job(second, success=False)
+    finally:
+        dashboard.close()
+
+    assert not dashboard.timer.is_alive()
+    assert os.path.exists(tmp_path / "lote" / "00001.log")
+    assert dashboard.failures == [second]
+    last_line = stream.getvalue().splitlines()[-1]
+    assert "2/2 procesadas" in last_line
+    assert "10.0MiB" in last_line
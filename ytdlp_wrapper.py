@@ -9,18 +9,323 @@ Wrapper simple para yt-dlp que descarga solo contenido en alta calidad:
 
 import json
 import os
+import re
+import shutil
 import sys
 import subprocess
 import argparse
+import cProfile
+import pstats
+import threading
+import tempfile
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import resource  # Solo disponible en sistemas Unix
+except ImportError:
+    resource = None
+
+class Tracer:
+    """
+    Registra spans de cada fase del wrapper en formato Chrome trace-event
+    (abrir con chrome://tracing o https://ui.perfetto.dev).
+    Si no se indica archivo de salida no registra nada.
+    """
+    def __init__(self, output_file=None):
+        self.output_file = output_file
+        self.enabled = output_file is not None
+        self.events = []
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+    
+    def children_rusage(self):
+        """Devuelve (user, sys, maxrss) acumulados de los procesos hijos"""
+        if resource is None:
+            return None
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return usage.ru_utime, usage.ru_stime, usage.ru_maxrss
+    
+    @contextmanager
+    def span(self, name, cat="wrapper", **args):
+        """
+        Mide tiempo de pared, tiempo de CPU propio y rusage de los hijos
+        del bloque. El diccionario devuelto permite añadir argumentos al span.
+        """
+        if not self.enabled:
+            yield args
+            return
+        
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        start_children = self.children_rusage()
+        try:
+            yield args
+        finally:
+            end_wall = time.perf_counter()
+            args["cpu_ms"] = round((time.process_time() - start_cpu) * 1000, 3)
+            end_children = self.children_rusage()
+            if start_children and end_children:
+                args["child_user_ms"] = round((end_children[0] - start_children[0]) * 1000, 3)
+                args["child_sys_ms"] = round((end_children[1] - start_children[1]) * 1000, 3)
+                if cat == "subprocess":
+                    # Pico de memoria del mayor hijo terminado hasta ahora, no de este
+                    # span: ru_maxrss está en KiB en Linux y en bytes en macOS
+                    args["children_peak_rss"] = end_children[2]
+            
+            self.events.append({
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": round((start_wall - self.origin) * 1e6, 3),
+                "dur": round((end_wall - start_wall) * 1e6, 3),
+                "pid": self.pid,
+                "tid": threading.get_ident(),
+                "args": {key: value for key, value in args.items() if value is not None}
+            })
+    
+    def save(self):
+        """Escribe la traza en el archivo de salida"""
+        if not self.enabled:
+            return False
+        
+        metadata = {
+            "name": "process_name",
+            "ph": "M",
+            "pid": self.pid,
+            "args": {"name": "ytdlp-wrapper"}
+        }
+        try:
+            with open(self.output_file, 'w', encoding='utf-8') as f:
+                json.dump({"traceEvents": [metadata] + self.events, "displayTimeUnit": "ms"},
+                          f, ensure_ascii=False, default=str)
+            return True
+        except Exception as e:
+            print(f"⚠ Error guardando traza: {e}", file=sys.stderr)
+            return False
+
+
+# Línea de progreso de yt-dlp, p. ej.:
+# [download]  45.3% of ~ 10.00MiB at  2.50MiB/s ETA 00:03 (frag 3/10)
+# [download] 100% of   10.00MiB in 00:00:03 at 3.21MiB/s
+PROGRESS_RE = re.compile(
+    r'\[download\]\s+(?P<percent>[\d.]+)%\s+of\s+~?\s*(?P<total>[\d.]+\s*[KMGTP]?i?B)'
+    r'(?:\s+in\s+[\d:]+)?'
+    r'(?:\s+at\s+(?:(?P<speed>[\d.]+\s*[KMGTP]?i?B/s)|Unknown\s*B/s))?'
+    r'(?:\s+ETA\s+(?:(?P<eta>[\d:]+)|Unknown))?'
+)
+
+def parse_size(text):
+    """Convierte un tamaño de yt-dlp ("10.00MiB", "512KB") a bytes"""
+    match = re.match(r'([\d.]+)\s*([KMGTP]?)(i?)B', text)
+    if not match:
+        return 0
+    number, prefix, binary = match.groups()
+    base = 1024 if binary else 1000
+    exponent = "KMGTP".index(prefix) + 1 if prefix else 0
+    return float(number) * base ** exponent
+
+def format_size(num_bytes):
+    """Formatea bytes en la unidad binaria más adecuada"""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f}{unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f}TiB"
+
+class BatchJob:
+    """
+    Estado de una URL dentro de un lote. La salida completa de yt-dlp
+    se escribe en su archivo de log; el panel solo muestra el agregado.
+    """
+    def __init__(self, dashboard, index, url, log_file):
+        self.dashboard = dashboard
+        self.index = index
+        self.url = url
+        self.title = None
+        self.log_file = log_file
+        self.log = open(log_file, 'w', encoding='utf-8')
+        self.percent = 0.0
+        self.speed = None
+        self.eta = None
+        self.current_bytes = 0
+        self.completed_bytes = 0
+        self.skipping = False  # El archivo actual ya estaba descargado
+        self.error = None
+    
+    @property
+    def downloaded_bytes(self):
+        return self.completed_bytes + self.current_bytes
+    
+    def write(self, text):
+        """Escribe una línea en el log del trabajo"""
+        if not self.log.closed:
+            self.log.write(text + "\n")
+    
+    def handle_line(self, line):
+        """Procesa una línea de salida de yt-dlp"""
+        self.write(line)
+        
+        match = PROGRESS_RE.search(line)
+        if match:
+            self.percent = float(match.group("percent"))
+            self.speed = match.group("speed")
+            self.eta = match.group("eta")
+            # Los archivos ya descargados no cuentan como bytes transferidos
+            if not self.skipping:
+                self.current_bytes = parse_size(match.group("total")) * self.percent / 100
+        elif '[download] Destination:' in line:
+            # Empieza otro archivo (elemento de playlist o pista de audio)
+            self.next_file(skipping=False)
+        elif 'has already been downloaded' in line:
+            self.next_file(skipping=True)
+        elif 'ERROR' in line:
+            self.error = line.strip()
+        
+        self.dashboard.refresh()
+    
+    def next_file(self, skipping):
+        """Acumula los bytes del archivo actual y empieza uno nuevo"""
+        self.completed_bytes += self.current_bytes
+        self.current_bytes = 0
+        self.percent = 0.0
+        self.skipping = skipping
+    
+    def close(self):
+        """Cierra el log y acumula los bytes del último archivo"""
+        self.next_file(skipping=False)
+        self.log.close()
+
+class BatchDashboard:
+    """
+    Panel agregado para descargas por lotes. En una terminal repinta como
+    mucho cada `refresh` segundos; sin TTY emite un resumen de una línea
+    cada `summary_interval` segundos. Un hilo temporizador repinta también
+    mientras yt-dlp no produce salida (consulta de información, fusión...).
+    """
+    def __init__(self, total, log_dir, refresh=0.5, summary_interval=10, stream=None):
+        self.stream = stream or sys.stdout
+        self.is_tty = self.stream.isatty()
+        self.total = total
+        self.log_dir = log_dir
+        os.makedirs(log_dir, exist_ok=True)
+        
+        self.active = []
+        self.failures = []
+        self.success_count = 0
+        self.failure_count = 0
+        self.finished_bytes = 0
+        
+        self.interval = refresh if self.is_tty else summary_interval
+        self.start_time = time.monotonic()
+        self.last_render = None
+        self.rendered_lines = 0
+        
+        # El temporizador y el hilo principal pueden repintar a la vez
+        self.render_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.timer = threading.Thread(target=self.tick, name="batch-dashboard", daemon=True)
+        self.timer.start()
+    
+    def tick(self):
+        """Repinta a intervalo fijo hasta que se cierre el panel"""
+        while not self.stop_event.wait(self.interval):
+            self.refresh()
+    
+    def start_job(self, index, url):
+        """Registra una URL activa y abre su archivo de log"""
+        job = BatchJob(self, index, url, os.path.join(self.log_dir, f"{index:05d}.log"))
+        self.active.append(job)
+        self.refresh()
+        return job
+    
+    def finish_job(self, job, success):
+        """Marca una URL como terminada"""
+        job.close()
+        if job in self.active:
+            self.active.remove(job)
+        self.finished_bytes += job.downloaded_bytes
+        
+        if success:
+            self.success_count += 1
+        else:
+            self.failure_count += 1
+            # Solo interesan las últimas fallas para el panel
+            self.failures = (self.failures + [job])[-3:]
+        
+        self.refresh()
+    
+    def summary_line(self):
+        """Resumen de una línea del estado del lote"""
+        elapsed = time.monotonic() - self.start_time
+        finished = self.success_count + self.failure_count
+        per_minute = finished / (elapsed / 60) if elapsed > 0 else 0.0
+        total_bytes = self.finished_bytes + sum(job.downloaded_bytes for job in list(self.active))
+        minutes, seconds = divmod(int(elapsed), 60)
+        hours, minutes = divmod(minutes, 60)
+        
+        return (f"📊 {finished}/{self.total} procesadas · ✅ {self.success_count} · "
+                f"❌ {self.failure_count} · ▶ {len(self.active)} activas · "
+                f"{format_size(total_bytes)} · {per_minute:.1f} elem/min · "
+                f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+    
+    def panel_lines(self):
+        """Líneas del panel completo para terminales"""
+        lines = [self.summary_line()]
+        for job in list(self.active):
+            name = job.title or job.url
+            lines.append(f"  ▶ [{job.index}] {name[:40]:<40} {job.percent:5.1f}% "
+                         f"{job.speed or '--':>11} ETA {job.eta or '--:--'}")
+        for job in self.failures:
+            lines.append(f"  ❌ [{job.index}] {job.error or job.title or job.url}")
+        return lines
+    
+    def refresh(self, force=False):
+        """Repinta el panel si ha pasado el intervalo de refresco"""
+        with self.render_lock:
+            now = time.monotonic()
+            if not force and self.last_render is not None and now - self.last_render < self.interval:
+                return
+            self.last_render = now
+            self.render()
+    
+    def render(self):
+        """Escribe el panel o, sin TTY, la línea de resumen"""
+        if not self.is_tty:
+            self.stream.write(self.summary_line() + "\n")
+            self.stream.flush()
+            return
+        
+        # Recortar al ancho de la terminal para que el cursor vuelva al inicio del panel
+        width = shutil.get_terminal_size().columns - 4
+        lines = [line[:width] for line in self.panel_lines()]
+        
+        output = ""
+        if self.rendered_lines:
+            output += f"\x1b[{self.rendered_lines}F"  # Subir al inicio del panel anterior
+        output += "\x1b[J" + "\n".join(lines) + "\n"
+        self.stream.write(output)
+        self.stream.flush()
+        self.rendered_lines = len(lines)
+    
+    def close(self):
+        """Detiene el temporizador, cierra los trabajos pendientes y pinta el estado final"""
+        self.stop_event.set()
+        self.timer.join()
+        for job in list(self.active):
+            self.finish_job(job, success=False)
+        self.refresh(force=True)
+
 class YTDLPWrapper:
-    def __init__(self, config_file=None):
+    def __init__(self, config_file=None, tracer=None):
         """
         Inicializa el wrapper con configuración desde archivo JSON
         """
         self.config = {}  # Inicializar config como diccionario vacío primero
+        self.tracer = tracer or Tracer()
+        self.current_job = None  # BatchJob activo mientras se muestra el panel de lote
         
         if config_file is None:
             # Buscar configuración en directorios estándar
@@ -36,7 +341,8 @@ class YTDLPWrapper:
                     break
         
         self.config_file = config_file or os.path.expanduser("~/.config/ytdlp-wrapper/ytdlp_config.json")
-        self.config = self.load_config()  # Ahora cargar la configuración
+        with self.tracer.span("load_config", path=self.config_file):
+            self.config = self.load_config()  # Ahora cargar la configuración
         
         # Determinar directorio para historial
         self.history_file = self.config.get("history_file", "download_history.json")
@@ -46,7 +352,8 @@ class YTDLPWrapper:
             os.makedirs(config_dir, exist_ok=True)
             self.history_file = os.path.join(config_dir, self.history_file)
             
-        self.history = self.load_history()
+        with self.tracer.span("load_history", path=self.history_file):
+            self.history = self.load_history()
         
     def load_config(self):
         """Carga la configuración desde archivo JSON o crea una por defecto"""
@@ -71,7 +378,12 @@ class YTDLPWrapper:
             "console_title": False,
             "quiet": False,
             "verbose": False,
-            "create_playlist_dir": True  # Nueva opción: crear carpeta para playlists
+            "create_playlist_dir": True,  # Nueva opción: crear carpeta para playlists
+            "batch_dashboard": True,  # Panel agregado para descargas desde archivo
+            "dashboard_refresh": 0.5,  # Segundos entre repintados del panel
+            "dashboard_summary_interval": 10,  # Segundos entre resúmenes sin TTY
+            "batch_log_directory": "logs",  # Logs por URL de cada lote
+            "batch_log_keep": 20  # Lotes cuyos logs se conservan (0 = todos)
         }
         
         try:
@@ -102,6 +414,16 @@ class YTDLPWrapper:
             
         return default_config
     
+    def notify(self, message):
+        """
+        Muestra un mensaje, o lo escribe en el log del trabajo activo para
+        no romper el panel de lote
+        """
+        if self.current_job is not None:
+            self.current_job.write(message)
+        else:
+            print(message)
+    
     def load_history(self):
         """Carga el historial de descargas desde archivo JSON"""
         history = {"downloads": []}
@@ -117,11 +439,12 @@ class YTDLPWrapper:
     def save_history(self):
         """Guarda el historial de descargas en archivo JSON"""
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, indent=4, ensure_ascii=False, default=str)
+            with self.tracer.span("save_history", entries=len(self.history.get("downloads", []))):
+                with open(self.history_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.history, f, indent=4, ensure_ascii=False, default=str)
         except Exception as e:
             if not self.config.get("quiet", False):
-                print(f"⚠ Error guardando historial: {e}")
+                self.notify(f"⚠ Error guardando historial: {e}")
     
     def add_to_history(self, url, title, filename, success=True):
         """Añade una descarga al historial"""
@@ -171,12 +494,14 @@ class YTDLPWrapper:
         """Verifica la versión de yt-dlp y ajusta las opciones disponibles"""
         try:
             if self.config.get("verbose", False):
-                result = subprocess.run(["yt-dlp", "--version"], capture_output=True, text=True)
+                with self.tracer.span("yt-dlp --version", cat="subprocess"):
+                    result = subprocess.run(["yt-dlp", "--version"], capture_output=True, text=True)
                 version_output = result.stdout.strip()
-                print(f"✅ yt-dlp versión: {version_output}")
+                self.notify(f"✅ yt-dlp versión: {version_output}")
             
             # Intentar obtener opciones disponibles
-            result = subprocess.run(["yt-dlp", "--help"], capture_output=True, text=True)
+            with self.tracer.span("yt-dlp --help", cat="subprocess"):
+                result = subprocess.run(["yt-dlp", "--help"], capture_output=True, text=True)
             help_text = result.stdout
             
             # Verificar opciones disponibles
@@ -186,15 +511,17 @@ class YTDLPWrapper:
             self.has_console_title = "--console-title" in help_text
             
             if not self.has_skip_existing and self.config.get("verbose", False):
-                print("⚠ Tu versión de yt-dlp no soporta --skip-existing")
+                self.notify("⚠ Tu versión de yt-dlp no soporta --skip-existing")
             if not self.has_embed_thumbnail and self.config.get("verbose", False):
-                print("⚠ Tu versión de yt-dlp no soporta --embed-thumbnail")
+                self.notify("⚠ Tu versión de yt-dlp no soporta --embed-thumbnail")
                 
             return True
         except (subprocess.CalledProcessError, FileNotFoundError):
+            if self.current_job is not None:
+                self.current_job.error = "yt-dlp no está instalado o no está en el PATH"
             if not self.config.get("quiet", False):
-                print("❌ Error: yt-dlp no está instalado o no está en el PATH")
-                print("Instala yt-dlp con: pip install yt-dlp")
+                self.notify("❌ Error: yt-dlp no está instalado o no está en el PATH")
+                self.notify("Instala yt-dlp con: pip install yt-dlp")
             return False
     
     def is_playlist_url(self, url):
@@ -261,19 +588,19 @@ class YTDLPWrapper:
             else:
                 cmd.append("--no-overwrites")
                 if self.config.get("verbose", False):
-                    print("⚠ Usando --no-overwrites en lugar de --skip-existing")
+                    self.notify("⚠ Usando --no-overwrites en lugar de --skip-existing")
             
         if self.config.get("embed_thumbnail", False):
             if hasattr(self, 'has_embed_thumbnail') and self.has_embed_thumbnail:
                 cmd.append("--embed-thumbnail")
             elif self.config.get("verbose", False):
-                print("⚠ Opción --embed-thumbnail no disponible en tu versión")
+                self.notify("⚠ Opción --embed-thumbnail no disponible en tu versión")
             
         if self.config.get("write_info_json", False):
             if hasattr(self, 'has_write_info_json') and self.has_write_info_json:
                 cmd.append("--write-info-json")
             elif self.config.get("verbose", False):
-                print("⚠ Opción --write-info-json no disponible en tu versión")
+                self.notify("⚠ Opción --write-info-json no disponible en tu versión")
             
         if self.config.get("write_description", False):
             cmd.append("--write-description")
@@ -291,7 +618,7 @@ class YTDLPWrapper:
             if hasattr(self, 'has_console_title') and self.has_console_title:
                 cmd.append("--console-title")
             elif self.config.get("verbose", False):
-                print("⚠ Opción --console-title no disponible en tu versión")
+                self.notify("⚠ Opción --console-title no disponible en tu versión")
         
         # Añadir URL al final
         cmd.append(url)
@@ -312,7 +639,9 @@ class YTDLPWrapper:
                 "--print", "%(playlist_count)s",
                 url
             ]
-            result = subprocess.run(info_cmd, capture_output=True, text=True, timeout=30)
+            with self.tracer.span("yt-dlp --print", cat="subprocess", url=url) as span_args:
+                result = subprocess.run(info_cmd, capture_output=True, text=True, timeout=30)
+                span_args["returncode"] = result.returncode
             
             if result.returncode == 0:
                 lines = result.stdout.strip().split('\n')
@@ -325,10 +654,10 @@ class YTDLPWrapper:
                 }
         except subprocess.TimeoutExpired:
             if self.config.get("verbose", False):
-                print("⚠ Tiempo de espera agotado obteniendo información del video")
+                self.notify("⚠ Tiempo de espera agotado obteniendo información del video")
         except Exception as e:
             if self.config.get("verbose", False):
-                print(f"⚠ Error obteniendo información: {e}")
+                self.notify(f"⚠ Error obteniendo información: {e}")
         
         return {
             "title": "Desconocido", 
@@ -338,17 +667,25 @@ class YTDLPWrapper:
             "playlist_count": None
         }
     
-    def download(self, url, output_path=None, force_playlist=False):
-        """Ejecuta la descarga con yt-dlp"""
-        if not self.config.get("quiet", False):
+    def download(self, url, output_path=None, force_playlist=False, job=None):
+        """
+        Ejecuta la descarga con yt-dlp. Si se pasa un BatchJob, la salida
+        va a su archivo de log y el progreso al panel del lote.
+        """
+        # Con panel de lote no se imprime nada por URL
+        show_output = not self.config.get("quiet", False) and job is None
+        
+        if show_output:
             print(f"\n📥 Preparando descarga: {url}")
         
         # Verificar si yt-dlp está instalado y obtener versión
-        if not self.check_ytdlp_version():
-            return False
+        with self.tracer.span("check_ytdlp_version"):
+            if not self.check_ytdlp_version():
+                return False
         
         # Obtener información del video
-        video_info = self.get_video_info(url)
+        with self.tracer.span("get_video_info", url=url):
+            video_info = self.get_video_info(url)
         title = video_info["title"]
         
         # Formatear duración
@@ -369,10 +706,16 @@ class YTDLPWrapper:
             duration_str = "Desconocido"
         
         # Construir comando de descarga
-        cmd, is_playlist = self.build_command(url, output_path, force_playlist)
+        with self.tracer.span("build_command", url=url):
+            cmd, is_playlist = self.build_command(url, output_path, force_playlist)
         
         # Mostrar información
-        if not self.config.get("quiet", False):
+        if job is not None:
+            job.title = title
+            job.write(f"URL: {url}")
+            job.write(f"Título: {title}")
+            job.write(f"Comando: {' '.join(cmd)}")
+        elif show_output:
             print(f"📁 Directorio: {output_path or self.config['output_directory']}")
             print(f"🎬 Título: {title}")
             print(f"👤 Creador: {video_info['uploader']}")
@@ -388,89 +731,101 @@ class YTDLPWrapper:
             print("-" * 50)
         
         try:
-            # Ejecutar yt-dlp
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
-            )
-            
-            # Mostrar salida en tiempo real si no está en modo quiet
-            if not self.config.get("quiet", False):
-                last_line_was_progress = False
-                for line in process.stdout:
-                    line = line.strip()
-                    if not line:
-                        continue
-                        
-                    # Manejar diferentes tipos de mensajes
-                    if '[download]' in line and '%' in line:
-                        # Línea de progreso - mostrar en la misma línea
-                        if last_line_was_progress:
-                            print(f"\r{line}", end='', flush=True)
-                        else:
-                            print(f"{line}", end='', flush=True)
-                        last_line_was_progress = True
-                    elif '[download]' in line and 'Downloading item' in line:
-                        # Nuevo video en playlist
-                        if last_line_was_progress:
-                            print()  # Nueva línea después del progreso
-                        print(f"\n{line}")
-                        last_line_was_progress = False
-                    elif 'ERROR' in line or 'WARNING' in line:
-                        if last_line_was_progress:
-                            print()  # Nueva línea después del progreso
-                        print(f"{line}")
-                        last_line_was_progress = False
-                    elif line:
-                        if last_line_was_progress:
-                            print()  # Nueva línea después del progreso
-                        print(f"{line}")
-                        last_line_was_progress = False
+            with self.tracer.span("yt-dlp", cat="subprocess", url=url) as span_args:
+                # Ejecutar yt-dlp
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                    bufsize=1,
+                    universal_newlines=True
+                )
                 
-                if last_line_was_progress:
-                    print()  # Nueva línea final después del progreso
-            else:
-                # En modo quiet, solo capturar la salida
-                process.communicate()
-            
-            process.wait()
+                if job is not None:
+                    # Salida completa al log del trabajo; el panel agrega el progreso
+                    for line in process.stdout:
+                        job.handle_line(line.rstrip())
+                # Mostrar salida en tiempo real si no está en modo quiet
+                elif show_output:
+                    last_line_was_progress = False
+                    for line in process.stdout:
+                        line = line.strip()
+                        if not line:
+                            continue
+                            
+                        # Manejar diferentes tipos de mensajes
+                        if '[download]' in line and '%' in line:
+                            # Línea de progreso - mostrar en la misma línea
+                            if last_line_was_progress:
+                                print(f"\r{line}", end='', flush=True)
+                            else:
+                                print(f"{line}", end='', flush=True)
+                            last_line_was_progress = True
+                        elif '[download]' in line and 'Downloading item' in line:
+                            # Nuevo video en playlist
+                            if last_line_was_progress:
+                                print()  # Nueva línea después del progreso
+                            print(f"\n{line}")
+                            last_line_was_progress = False
+                        elif 'ERROR' in line or 'WARNING' in line:
+                            if last_line_was_progress:
+                                print()  # Nueva línea después del progreso
+                            print(f"{line}")
+                            last_line_was_progress = False
+                        elif line:
+                            if last_line_was_progress:
+                                print()  # Nueva línea después del progreso
+                            print(f"{line}")
+                            last_line_was_progress = False
+                    
+                    if last_line_was_progress:
+                        print()  # Nueva línea final después del progreso
+                else:
+                    # En modo quiet, solo capturar la salida
+                    process.communicate()
+                
+                process.wait()
+                span_args["returncode"] = process.returncode
             
             if process.returncode == 0:
-                if not self.config.get("quiet", False):
+                if show_output:
                     print(f"\n✅ Descarga completada: {title}")
                 # Añadir al historial
                 self.add_to_history(url, title, "", success=True)
                 return True
             else:
-                if not self.config.get("quiet", False):
+                if show_output:
                     print(f"\n❌ Error en la descarga: {title}")
                 self.add_to_history(url, title, "", success=False)
                 return False
                 
         except KeyboardInterrupt:
-            if not self.config.get("quiet", False):
+            if show_output:
                 print("\n⏹ Descarga interrumpida por el usuario")
             return False
         except Exception as e:
-            if not self.config.get("quiet", False):
+            if job is not None:
+                job.error = f"Error ejecutando yt-dlp: {e}"
+                job.write(job.error)
+            elif show_output:
                 print(f"\n❌ Error ejecutando yt-dlp: {e}")
             self.add_to_history(url, title, "", success=False)
             return False
     
-    def download_playlist(self, playlist_url, output_path=None, no_playlist_dir=False):
+    def download_playlist(self, playlist_url, output_path=None, no_playlist_dir=False, job=None):
         """Descarga una playlist completa"""
-        if not self.config.get("quiet", False):
+        show_output = not self.config.get("quiet", False) and job is None
+        
+        if show_output:
             print(f"\n🎵 Descargando playlist: {playlist_url}")
         
         if output_path is None:
             output_path = self.config["output_directory"]
         
         # Obtener información de la playlist
-        video_info = self.get_video_info(playlist_url)
+        with self.tracer.span("get_video_info", url=playlist_url):
+            video_info = self.get_video_info(playlist_url)
         playlist_name = video_info.get("playlist_title") or "playlist"
         playlist_count = video_info.get("playlist_count") or "?"
         
@@ -486,13 +841,13 @@ class YTDLPWrapper:
             playlist_dir = os.path.join(output_path, safe_name)
             dir_display = safe_name
         
-        if not self.config.get("quiet", False):
+        if show_output:
             print(f"📂 Playlist: {playlist_name}")
             print(f"🎵 Videos: {playlist_count}")
             print(f"📁 Directorio: {dir_display}")
         
         # Forzar descarga como playlist
-        success = self.download(playlist_url, playlist_dir, force_playlist=True)
+        success = self.download(playlist_url, playlist_dir, force_playlist=True, job=job)
         
         return success
     
@@ -513,19 +868,45 @@ class YTDLPWrapper:
             if not self.config.get("quiet", False):
                 print(f"\n📄 Procesando {len(urls)} URLs desde: {file_path}")
             
+            # Panel agregado en lugar de la salida completa de cada URL
+            dashboard = None
+            if not self.config.get("quiet", False) and self.config.get("batch_dashboard", True):
+                dashboard = BatchDashboard(
+                    len(urls),
+                    self.create_batch_log_directory(),
+                    refresh=self.config.get("dashboard_refresh", 0.5),
+                    summary_interval=self.config.get("dashboard_summary_interval", 10)
+                )
+                print(f"📝 Logs por URL en: {dashboard.log_dir}")
+            
             success_count = 0
-            for i, url in enumerate(urls, 1):
-                if not self.config.get("quiet", False):
-                    print(f"\n{'='*60}")
-                    print(f"📥 Procesando URL {i}/{len(urls)}")
-                    print(f"{'='*60}")
-                
-                if is_playlist or self.is_playlist_url(url):
-                    if self.download_playlist(url, output_path, no_playlist_dir):
-                        success_count += 1
-                else:
-                    if self.download(url, output_path):
+            try:
+                for i, url in enumerate(urls, 1):
+                    job = None
+                    if dashboard is not None:
+                        job = dashboard.start_job(i, url)
+                        self.current_job = job
+                    elif not self.config.get("quiet", False):
+                        print(f"\n{'='*60}")
+                        print(f"📥 Procesando URL {i}/{len(urls)}")
+                        print(f"{'='*60}")
+                    
+                    with self.tracer.span("url", index=i, url=url) as span_args:
+                        if is_playlist or self.is_playlist_url(url):
+                            success = self.download_playlist(url, output_path, no_playlist_dir, job=job)
+                        else:
+                            success = self.download(url, output_path, job=job)
+                        span_args["success"] = success
+                    
+                    if job is not None:
+                        self.current_job = None
+                        dashboard.finish_job(job, success)
+                    if success:
                         success_count += 1
+            finally:
+                self.current_job = None
+                if dashboard is not None:
+                    dashboard.close()
             
             if not self.config.get("quiet", False):
                 print(f"\n{'='*60}")
@@ -538,6 +919,33 @@ class YTDLPWrapper:
             print(f"❌ Error procesando archivo: {e}")
             return False
     
+    def create_batch_log_directory(self):
+        """
+        Crea el directorio para los logs por URL de un nuevo lote y borra
+        los de lotes anteriores que superen `batch_log_keep`
+        """
+        log_root = self.config.get("batch_log_directory", "logs")
+        if not os.path.isabs(log_root):
+            # Si es relativo, guardar en directorio de configuración
+            log_root = os.path.join(os.path.dirname(self.config_file), log_root)
+        os.makedirs(log_root, exist_ok=True)
+        
+        # mkdtemp garantiza un nombre único aunque dos lotes empiecen en el mismo segundo
+        log_dir = tempfile.mkdtemp(prefix=datetime.now().strftime("lote-%Y%m%d-%H%M%S-"), dir=log_root)
+        
+        keep = self.config.get("batch_log_keep", 20)
+        if keep > 0:
+            previous = [
+                os.path.join(log_root, name) for name in os.listdir(log_root)
+                if name.startswith("lote-") and os.path.join(log_root, name) != log_dir
+            ]
+            previous.sort(key=os.path.getmtime)
+            # El lote nuevo cuenta dentro de los que se conservan
+            for old_dir in previous[:max(len(previous) - (keep - 1), 0)]:
+                shutil.rmtree(old_dir, ignore_errors=True)
+        
+        return log_dir
+    
     def show_history(self, limit=20):
         """Muestra el historial de descargas"""
         if not self.history.get("downloads"):
@@ -602,6 +1010,11 @@ Opciones de calidad:
 Modos:
   --quiet                                # Modo silencioso
   --verbose                              # Modo detallado
+  --no-dashboard                         # Salida completa por URL en lotes (sin panel)
+
+Diagnóstico:
+  --trace traza.json                     # Guardar spans en formato Chrome trace-event
+  --profile                              # Ejecutar el wrapper bajo cProfile
         """
     )
     
@@ -620,11 +1033,31 @@ Modos:
     parser.add_argument("--no-mp4", action="store_true", help="Usar Matroska en lugar de MP4")
     parser.add_argument("--quiet", action="store_true", help="Modo silencioso")
     parser.add_argument("--verbose", action="store_true", help="Modo detallado")
+    parser.add_argument("--no-dashboard", action="store_true", help="Mostrar la salida completa de cada URL en descargas por lotes")
+    parser.add_argument("--trace", metavar="ARCHIVO", help="Guardar traza de cada fase en formato Chrome trace-event (JSON)")
+    parser.add_argument("--profile", action="store_true", help="Ejecutar el wrapper bajo cProfile y mostrar estadísticas")
     
     args = parser.parse_args()
+    tracer = Tracer(args.trace)
     
+    try:
+        if args.profile:
+            profiler = cProfile.Profile()
+            try:
+                profiler.runcall(run, args, parser, tracer)
+            finally:
+                stats = pstats.Stats(profiler, stream=sys.stderr)
+                stats.sort_stats("cumulative").print_stats(30)
+        else:
+            run(args, parser, tracer)
+    finally:
+        if tracer.save() and not args.quiet:
+            print(f"📈 Traza guardada en: {args.trace}")
+
+def run(args, parser, tracer):
+    """Ejecuta la acción solicitada en la línea de comandos"""
     # Inicializar wrapper con archivo de configuración personalizado
-    wrapper = YTDLPWrapper(args.config_file)
+    wrapper = YTDLPWrapper(args.config_file, tracer)
     
     # Aplicar opciones de línea de comandos
     if args.max_quality:
@@ -637,6 +1070,8 @@ Modos:
         wrapper.config["quiet"] = True
     if args.verbose:
         wrapper.config["verbose"] = True
+    if args.no_dashboard:
+        wrapper.config["batch_dashboard"] = False
     
     # Mostrar información de configuración
     if args.config == "mostrar":